@@ -4,10 +4,15 @@ ETH EHR999 指标计算与图表生成
 独立运行，生成 TradingView 风格的 HTML 图表
 """
 import time  # 确保在文件顶部导入了 time 模块
-import json
+import math
+import hashlib
 import pandas as pd
 import numpy as np
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -17,6 +22,18 @@ from pathlib import Path
 # ================================================
 SYMBOL = 'ETHUSDT'
 OUTPUT_FILE = 'index.html'
+CACHE_FILE = 'klines_{symbol}_{interval}.parquet'  # 本地 K 线缓存（按交易对和周期区分），后续运行只增量拉取
+STATE_FILE = '.state'  # 上次生成图表时最新数据的哈希
+
+# 币安 K 线周期单位对应的毫秒数（'M' 按最短的 28 天计，保证每个窗口不超过 1000 根）
+INTERVAL_UNIT_MS = {
+    's': 1000,
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+    'w': 7 * 24 * 60 * 60 * 1000,
+    'M': 28 * 24 * 60 * 60 * 1000,
+}
 
 
 # ================================================
@@ -25,61 +42,96 @@ OUTPUT_FILE = 'index.html'
 def fetch_eth_klines(symbol='ETHUSDT', interval='1d', limit=1000):
     """
     从币安 API 获取全量 K 线数据
-    通过分批请求获取所有历史数据
+    按 K 线周期预先切分时间窗口，并发请求所有历史数据
+    若存在本地 Parquet 缓存，则只拉取缓存之后的增量数据
     """
     url = 'https://api3.binance.com/api/v3/klines'
+    cache = Path(CACHE_FILE.format(symbol=symbol, interval=interval))
+    cached = None
     all_data = []
     
-    print(f"正在从币安获取 {symbol} {interval} 全量K线数据...")
-    
     # ETH 上线时间约为 2017-08-17
     start_time = int(datetime(2017, 8, 17).timestamp() * 1000)
+    end_time = int(time.time() * 1000)
+    
+    if cache.exists():
+        try:
+            cached = pd.read_parquet(
+                cache, columns=['open_time', 'open', 'high', 'low', 'close', 'volume']
+            )
+            # 最后一根 K 线可能尚未收盘，从它开始重新拉取并覆盖
+            start_time = cached['open_time'].max().value // 1_000_000
+            print(f"读取本地缓存 {len(cached)} 条，从 {cached['open_time'].max()} 开始增量获取...")
+        except Exception as e:
+            print(f"读取缓存失败，改为全量获取: {e}")
+            cached = None
+    
+    if cached is None:
+        print(f"正在从币安获取 {symbol} {interval} 全量K线数据...")
     
     try:
-        while True:
-            params = {
-                'symbol': symbol,
-                'interval': interval,
-                'startTime': start_time,
-                'limit': 1000  # 币安单次最多1000条
-            }
-            
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            
-            if not data:
-                break
-            
-            all_data.extend(data)
-            print(f"  已获取 {len(all_data)} 条数据...")
+        # 每个窗口恰好容纳 1000 根 K 线（币安单次最多1000条），窗口之间互不依赖
+        page_ms = int(interval[:-1]) * INTERVAL_UNIT_MS[interval[-1]] * 1000
+        n_pages = max(1, math.ceil((end_time - start_time) / page_ms))
+        windows = [
+            (start_time + i * page_ms, start_time + (i + 1) * page_ms - 1)
+            for i in range(n_pages)
+        ]
+        
+        # 复用同一个 Session（HTTP keep-alive），避免每页重新握手 TLS
+        with requests.Session() as session:
+            session.headers.update({'Accept': 'application/json'})
+            retry = Retry(total=3, backoff_factor=0.3,
+                          status_forcelist=[429, 500, 502, 503, 504])
+            session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4,
+                                                  max_retries=retry))
             
-            # 更新起始时间为最后一条数据的时间 + 1
-            start_time = data[-1][0] + 1
+            def fetch_window(window):
+                params = {
+                    'symbol': symbol,
+                    'interval': interval,
+                    'startTime': window[0],
+                    'endTime': window[1],
+                    'limit': 1000
+                }
+                response = session.get(url, params=params, timeout=30)
+                response.raise_for_status()
+                return orjson.loads(response.content)
             
-            # 如果返回数据少于1000条，说明已经获取完毕
-            if len(data) < 1000:
-                break
+            # 最多 4 个并发，避免触发币安的权重限制；map 按窗口顺序返回结果
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                for data in executor.map(fetch_window, windows):
+                    all_data.extend(data)
+                    print(f"  已获取 {len(all_data)} 条数据...")
         
         if not all_data:
+            if cached is not None:
+                print("没有新数据，使用本地缓存")
+                return cached
             print("未获取到数据")
             return None
         
-        df = pd.DataFrame(all_data, columns=[
-            'open_time', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-            'taker_buy_quote', 'ignore'
-        ])
+        # 直接按列构建带类型的 DataFrame，只保留用到的 OHLCV 列
+        arr = np.asarray(all_data, dtype=object)
+        df = pd.DataFrame({
+            'open_time': pd.to_datetime(arr[:, 0].astype(np.int64), unit='ms'),
+            'open': arr[:, 1].astype(np.float64),
+            'high': arr[:, 2].astype(np.float64),
+            'low': arr[:, 3].astype(np.float64),
+            'close': arr[:, 4].astype(np.float64),
+            'volume': arr[:, 5].astype(np.float64),
+        })
         
-        df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
-        df['close'] = df['close'].astype(float)
-        df['open'] = df['open'].astype(float)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['volume'] = df['volume'].astype(float)
+        if cached is not None:
+            # 缓存与新数据重叠的部分（最后一根未收盘的 K 线）以新拉取的为准
+            cached = cached[cached['open_time'] < df['open_time'].iloc[0]]
+            df = pd.concat([cached, df], ignore_index=True)
         
-        # 去重
-        df = df.drop_duplicates(subset=['open_time']).reset_index(drop=True)
+        # 去重：open_time 单调递增，重复只会相邻出现，只保留严格递增的行
+        t = df['open_time'].values.astype('i8')
+        df = df[np.r_[True, t[1:] > t[:-1]]].reset_index(drop=True)
+        
+        df.to_parquet(cache, compression='zstd')
         
         print(f"获取成功: {len(df)} 条数据")
         print(f"时间范围: {df['open_time'].min()} 到 {df['open_time'].max()}")
@@ -94,6 +146,21 @@ def fetch_eth_klines(symbol='ETHUSDT', interval='1d', limit=1000):
 # ================================================
 # EHR999 指标计算
 # ================================================
+def rolling_mean(values, window):
+    """
+    基于累加和的滑动平均，O(N) 复杂度，与窗口大小无关
+    前 window-1 个位置为 NaN，与 pandas rolling(window).mean() 一致
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if 0 < window <= len(values):
+        csum = np.cumsum(values)
+        out[window - 1] = csum[window - 1]
+        out[window:] = csum[window:] - csum[:-window]
+        out[window - 1:] /= window
+    return out
+
+
 def calculate_ehr999(df):
     """
     计算 EHR999 指标
@@ -102,7 +169,8 @@ def calculate_ehr999(df):
     """
     print("正在计算 EHR999 指标...")
     
-    df = df.copy()
+    # 下游只用到 open_time 和 close，不复制其余列
+    df = df[['open_time', 'close']].copy()
     data_length = len(df)
     
     # 根据数据量调整移动平均窗口
@@ -112,7 +180,9 @@ def calculate_ehr999(df):
         ma_window = 200
     
     # 计算 MA200
-    df['MA200'] = df['close'].rolling(window=ma_window).mean()
+    close = df['close'].to_numpy(dtype=np.float64)
+    ma_short = rolling_mean(close, ma_window)
+    df['MA200'] = ma_short
     
     # 计算长期移动平均
     max_long_window = int(len(df) * 0.6)
@@ -121,10 +191,11 @@ def calculate_ehr999(df):
         long_window = min(ma_window + 50, len(df) - 10)
     
     print(f"使用 MA{ma_window} 和 MA{long_window} 计算 EHR999")
-    df['MA_long'] = df['close'].rolling(window=long_window).mean()
+    ma_long = rolling_mean(close, long_window)
+    df['MA_long'] = ma_long
     
-    # 计算 EHR999
-    df['EHR999'] = (df['close'] / df['MA200']) * (df['close'] / df['MA_long'])
+    # 计算 EHR999：(c / m1) * (c / m2) 合并为 c² / (m1 * m2)，只做一次除法
+    df['EHR999'] = close * close / (ma_short * ma_long)
     
     # 删除 NaN
     df = df.dropna(subset=['EHR999'])
@@ -135,81 +206,42 @@ def calculate_ehr999(df):
 
 
 # ================================================
-# 生成 HTML 图表
+# HTML 模板
 # ================================================
-def generate_html_chart(df, symbol='ETHUSDT', output_path=None):
-    """
-    生成 TradingView 风格的 EHR999 HTML 图表
-    """
-    print("正在生成 HTML 图表...")
-    
-    if df is None or df.empty:
-        print("错误：数据为空")
-        return None
-    
-    # 准备数据
-    ehr999_data = []
-    for _, row in df.iterrows():
-        if pd.notna(row['EHR999']):
-            timestamp = int(row['open_time'].timestamp())
-            ehr999_data.append({
-                'time': timestamp,
-                'value': float(row['EHR999'])
-            })
-    
-    # 获取最新值
-    start_time = df['open_time'].min().strftime('%Y-%m-%d')
-    end_time = df['open_time'].max().strftime('%Y-%m-%d')
-    latest_ehr999 = df['EHR999'].iloc[-1]
-    latest_price = df['close'].iloc[-1]
-    latest_time = df['open_time'].iloc[-1].strftime('%Y-%m-%d %H:%M')
-    
-    # 计算定投倍数和市场状态
-    if latest_ehr999 < 0.73:
-        invest_multiplier = "2.0x ~ 3.0x"
-        market_status = "极度低估 (钻石坑)"
-        status_color = "#00c853"
-    elif latest_ehr999 < 1.20:
-        invest_multiplier = "1.5x"
-        market_status = "相对低估 (黄金坑)"
-        status_color = "#ffd600"
-    elif latest_ehr999 < 1.50:
-        invest_multiplier = "1.0x"
-        market_status = "合理估值 (定投区)"
-        status_color = "#2196f3"
-    elif latest_ehr999 < 3.0:
-        invest_multiplier = "0x (停止)"
-        market_status = "持币待涨"
-        status_color = "#9e9e9e"
-    elif latest_ehr999 < 4.5:
-        invest_multiplier = "减仓"
-        market_status = "泡沫初现 (减仓区)"
-        status_color = "#ff9800"
-    elif latest_ehr999 < 6.5:
-        invest_multiplier = "清仓50-80%"
-        market_status = "极度泡沫 (清仓区)"
-        status_color = "#ff5722"
-    else:
-        invest_multiplier = "全部卖出"
-        market_status = "疯狂顶部 (逃顶区)"
-        status_color = "#d50000"
-    
-    # JSON 数据
-    ehr999_data_json = json.dumps(ehr999_data)
-    
-    # 阈值线配置
-    market_levels = [
-        (0.73, '#00c853', '钻石坑/黄金坑'),
-        (1.20, '#ffd600', '黄金坑/定投区'),
-        (1.50, '#2196f3', '定投截止线'),
-        (3.0, '#ff9800', '减仓区'),
-        (4.5, '#ff5722', '清仓区'),
-        (6.5, '#d50000', '逃顶区'),
-    ]
-    
-    level_lines_js = ""
-    for ehr_value, color, title in market_levels:
-        level_lines_js += f"""
+# 阈值线配置
+MARKET_LEVELS = [
+    (0.73, '#00c853', '钻石坑/黄金坑'),
+    (1.20, '#ffd600', '黄金坑/定投区'),
+    (1.50, '#2196f3', '定投截止线'),
+    (3.0, '#ff9800', '减仓区'),
+    (4.5, '#ff5722', '清仓区'),
+    (6.5, '#d50000', '逃顶区'),
+]
+EHR999_THRESHOLDS = np.array([ehr_value for ehr_value, _, _ in MARKET_LEVELS])
+
+# 各区间的 (定投倍数, 市场状态, 状态颜色)，下标由 np.searchsorted(EHR999_THRESHOLDS, ...) 得到
+MARKET_ZONES = [
+    ("2.0x ~ 3.0x", "极度低估 (钻石坑)", "#00c853"),
+    ("1.5x", "相对低估 (黄金坑)", "#ffd600"),
+    ("1.0x", "合理估值 (定投区)", "#2196f3"),
+    ("0x (停止)", "持币待涨", "#9e9e9e"),
+    ("减仓", "泡沫初现 (减仓区)", "#ff9800"),
+    ("清仓50-80%", "极度泡沫 (清仓区)", "#ff5722"),
+    ("全部卖出", "疯狂顶部 (逃顶区)", "#d50000"),
+]
+
+# 策略表各行：(徽章样式, 市场状态, EHR999 区间, 历史概率, 建议操作, 倍数单元格样式, 定投倍数)
+STRATEGY_TABLE_ROWS = [
+    ('status-diamond', '极度低估 (钻石坑)', '&lt; 0.73', '底部 10%', '重仓抄底', 'multiplier', '2.0x ~ 3.0x'),
+    ('status-gold', '相对低估 (黄金坑)', '0.73 ~ 1.20', '10% ~ 40%', '加大定投', 'multiplier', '1.5x'),
+    ('status-normal', '合理估值 (定投区)', '1.20 ~ 1.50', '40% ~ 55%', '标准定投', 'multiplier', '1.0x'),
+    ('status-stop', '定投截止 / 持币待涨', '1.50 ~ 3.0', '前 45%', '停止定投，只拿不动', 'multiplier-zero', '0x'),
+    ('status-reduce', '泡沫初现 (减仓区)', '3.0 ~ 4.5', '顶部 15%', '小额止盈', '', '每涨10%卖5%'),
+    ('status-clear', '极度泡沫 (清仓区)', '4.5 ~ 6.5', '顶部 5%', '大力止盈', '', '清仓 50%~80%'),
+    ('status-escape', '疯狂顶部 (逃顶区)', '&gt; 6.5', '顶部 1%', '清空离场', '', '全部卖出'),
+]
+
+LEVEL_LINE_TEMPLATE = """
         ehr999Series.createPriceLine({{
             price: {ehr_value},
             color: '{color}',
@@ -219,19 +251,24 @@ def generate_html_chart(df, symbol='ETHUSDT', output_path=None):
             title: '{title}'
         }});
         """
-    
-    # 图例
-    legend_items = ""
-    for ehr_value, color, title in market_levels:
-        legend_items += f'''
+
+STRATEGY_ROW_TEMPLATE = '''                    <tr class="{row_class}">
+                        <td><span class="status-badge {badge_class}">{status}</span></td>
+                        <td>{ehr_range}</td>
+                        <td>{probability}</td>
+                        <td>{action}</td>
+                        <td{multiplier_attr}>{multiplier}</td>
+                    </tr>
+'''
+
+LEGEND_ITEM_TEMPLATE = '''
             <div class="legend-item">
                 <div class="legend-color" style="background: {color};"></div>
                 <span>{ehr_value} ({title})</span>
             </div>'''
 
-    
-    # HTML 模板
-    html_content = f'''<!DOCTYPE html>
+# 页面模板，在模块加载时构建一次，生成时只做一次 format
+HTML_TEMPLATE = '''<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
@@ -381,56 +418,7 @@ def generate_html_chart(df, symbol='ETHUSDT', output_path=None):
                     </tr>
                 </thead>
                 <tbody>
-                    <tr class="{'current-row' if latest_ehr999 < 0.73 else ''}">
-                        <td><span class="status-badge status-diamond">极度低估 (钻石坑)</span></td>
-                        <td>&lt; 0.73</td>
-                        <td>底部 10%</td>
-                        <td>重仓抄底</td>
-                        <td class="multiplier">2.0x ~ 3.0x</td>
-                    </tr>
-                    <tr class="{'current-row' if 0.73 <= latest_ehr999 < 1.20 else ''}">
-                        <td><span class="status-badge status-gold">相对低估 (黄金坑)</span></td>
-                        <td>0.73 ~ 1.20</td>
-                        <td>10% ~ 40%</td>
-                        <td>加大定投</td>
-                        <td class="multiplier">1.5x</td>
-                    </tr>
-                    <tr class="{'current-row' if 1.20 <= latest_ehr999 < 1.50 else ''}">
-                        <td><span class="status-badge status-normal">合理估值 (定投区)</span></td>
-                        <td>1.20 ~ 1.50</td>
-                        <td>40% ~ 55%</td>
-                        <td>标准定投</td>
-                        <td class="multiplier">1.0x</td>
-                    </tr>
-                    <tr class="{'current-row' if 1.50 <= latest_ehr999 < 3.0 else ''}">
-                        <td><span class="status-badge status-stop">定投截止 / 持币待涨</span></td>
-                        <td>1.50 ~ 3.0</td>
-                        <td>前 45%</td>
-                        <td>停止定投，只拿不动</td>
-                        <td class="multiplier-zero">0x</td>
-                    </tr>
-                    <tr class="{'current-row' if 3.0 <= latest_ehr999 < 4.5 else ''}">
-                        <td><span class="status-badge status-reduce">泡沫初现 (减仓区)</span></td>
-                        <td>3.0 ~ 4.5</td>
-                        <td>顶部 15%</td>
-                        <td>小额止盈</td>
-                        <td>每涨10%卖5%</td>
-                    </tr>
-                    <tr class="{'current-row' if 4.5 <= latest_ehr999 < 6.5 else ''}">
-                        <td><span class="status-badge status-clear">极度泡沫 (清仓区)</span></td>
-                        <td>4.5 ~ 6.5</td>
-                        <td>顶部 5%</td>
-                        <td>大力止盈</td>
-                        <td>清仓 50%~80%</td>
-                    </tr>
-                    <tr class="{'current-row' if latest_ehr999 >= 6.5 else ''}">
-                        <td><span class="status-badge status-escape">疯狂顶部 (逃顶区)</span></td>
-                        <td>&gt; 6.5</td>
-                        <td>顶部 1%</td>
-                        <td>清空离场</td>
-                        <td>全部卖出</td>
-                    </tr>
-                </tbody>
+{strategy_rows}                </tbody>
             </table>
         </div>
     </div>
@@ -465,7 +453,8 @@ def generate_html_chart(df, symbol='ETHUSDT', output_path=None):
             priceFormat: {{ type: 'price', precision: 4, minMove: 0.0001 }},
         }});
         
-        const ehr999Data = {ehr999_data_json};
+        const ehr999Columns = {ehr999_data_json};
+        const ehr999Data = ehr999Columns.time.map((time, i) => ({{ time, value: ehr999Columns.value[i] }}));
         ehr999Series.setData(ehr999Data);
         
         {level_lines_js}
@@ -481,17 +470,119 @@ def generate_html_chart(df, symbol='ETHUSDT', output_path=None):
     </script>
 </body>
 </html>'''
+
+# 模板及阈值/区间表的指纹，模板或配置变化后强制重新生成图表
+TEMPLATE_VERSION = hashlib.blake2b(repr((
+    HTML_TEMPLATE, LEVEL_LINE_TEMPLATE, LEGEND_ITEM_TEMPLATE, STRATEGY_ROW_TEMPLATE,
+    MARKET_LEVELS, MARKET_ZONES, STRATEGY_TABLE_ROWS,
+)).encode(), digest_size=8).hexdigest()
+
+
+# ================================================
+# 生成 HTML 图表
+# ================================================
+def generate_html_chart(df, symbol='ETHUSDT', output_path=None):
+    """
+    生成 TradingView 风格的 EHR999 HTML 图表
+    """
+    print("正在生成 HTML 图表...")
+    
+    if df is None or df.empty:
+        print("错误：数据为空")
+        return None
     
-    # --- 简化的保存逻辑 ---
-    # 强制直接在当前目录下创建文件
-    with open("index.html", 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    # 获取最新值（数据按 open_time 升序，首尾即时间范围）
+    first_ts = df['open_time'].iloc[0]
+    last_ts = df['open_time'].iloc[-1]
+    start_time = f'{first_ts.year:04d}-{first_ts.month:02d}-{first_ts.day:02d}'
+    end_time = f'{last_ts.year:04d}-{last_ts.month:02d}-{last_ts.day:02d}'
+    latest_ehr999 = df['EHR999'].iloc[-1]
+    latest_price = df['close'].iloc[-1]
+    latest_time = f'{end_time} {last_ts.hour:02d}:{last_ts.minute:02d}'
+    
+    target = Path(output_path or OUTPUT_FILE)
+    
+    # 准备数据
+    # 向量化转换：秒级时间戳 + 过滤 NaN
+    t = df['open_time'].values.astype('datetime64[s]').astype(np.int64)
+    v = df['EHR999'].to_numpy(dtype=np.float64)
+    mask = ~np.isnan(v)
+    t_int = t[mask]
+    v_float = v[mask]
+    
+    # 模板、完整图表数据和最新值都与上次生成时相同则跳过模板渲染和写盘
+    state_file = Path(STATE_FILE)
+    state = hashlib.blake2b(digest_size=8)
+    state.update(f'{TEMPLATE_VERSION}{symbol}{latest_ehr999:.6f}{latest_price:.2f}{latest_time}{target}'.encode())
+    state.update(t_int.tobytes())
+    state.update(v_float.tobytes())
+    state_hash = state.hexdigest()
+    if (target.exists() and state_file.exists()
+            and state_file.read_text(encoding='utf-8').strip() == state_hash):
+        print("数据无变化，跳过 HTML 生成")
+        return str(target)
+    
+    # 计算定投倍数和市场状态（side='right'：恰好等于阈值时归入更高的区间）
+    zone_idx = int(np.searchsorted(EHR999_THRESHOLDS, latest_ehr999, side='right'))
+    invest_multiplier, market_status, status_color = MARKET_ZONES[zone_idx]
+    
+    # JSON 数据（按列输出，由 orjson 直接序列化 NumPy 数组，前端再组装成点）
+    ehr999_data_json = orjson.dumps(
+        {'time': t_int, 'value': v_float},
+        option=orjson.OPT_SERIALIZE_NUMPY
+    ).decode()
+    
+    # 阈值线
+    level_lines_js = "".join(
+        LEVEL_LINE_TEMPLATE.format(ehr_value=ehr_value, color=color, title=title)
+        for ehr_value, color, title in MARKET_LEVELS
+    )
+    
+    # 图例
+    legend_items = "".join(
+        LEGEND_ITEM_TEMPLATE.format(ehr_value=ehr_value, color=color, title=title)
+        for ehr_value, color, title in MARKET_LEVELS
+    )
+    
+    # 策略表，当前所处区间所在行高亮
+    strategy_rows = "".join(
+        STRATEGY_ROW_TEMPLATE.format(
+            row_class='current-row' if i == zone_idx else '',
+            badge_class=badge_class,
+            status=status,
+            ehr_range=ehr_range,
+            probability=probability,
+            action=action,
+            multiplier_attr=f' class="{multiplier_class}"' if multiplier_class else '',
+            multiplier=multiplier,
+        )
+        for i, (badge_class, status, ehr_range, probability, action, multiplier_class, multiplier)
+        in enumerate(STRATEGY_TABLE_ROWS)
+    )
+    
+    # HTML 模板
+    html_content = HTML_TEMPLATE.format(
+        symbol=symbol,
+        latest_price=latest_price,
+        latest_ehr999=latest_ehr999,
+        invest_multiplier=invest_multiplier,
+        market_status=market_status,
+        status_color=status_color,
+        latest_time=latest_time,
+        legend_items=legend_items,
+        start_time=start_time,
+        end_time=end_time,
+        strategy_rows=strategy_rows,
+        ehr999_data_json=ehr999_data_json,
+        level_lines_js=level_lines_js,
+    )
     
-    print(f"✅ HTML 图表已成功写入到当前目录: index.html")
-    return "index.html"
+    # 未指定 output_path 时写入当前目录下的 index.html
+    target.write_bytes(html_content.encode('utf-8'))
+    state_file.write_text(state_hash, encoding='utf-8')
     
-    print(f"✅ HTML 图表已保存到: {output_path}")
-    return str(output_path)
+    print(f"✅ HTML 图表已保存到: {target}")
+    return str(target)
 
 
 if __name__ == '__main__':